@@ -3,7 +3,8 @@ import streamlit as st
 from snowflake.snowpark.context import get_active_session
 import snowflake.snowpark.functions as F
 from snowflake.ml.registry.registry import Registry
-import snowflake.snowpark.types as T
+
+from nike_incremental_scoring import PredictionCache, demand_partials, lift_kpis, priced_rows, score_changed
 
 # Write directly to the app
 st.title("Monthly Pricing App :athletic_shoe:")
@@ -117,107 +118,75 @@ st.write(
     """
 )
 
+# Cache the product's pricing rows and feature detail across reruns
+product_key = (brand, item)
+if st.session_state.get("product_key") != product_key:
+    st.session_state.product_key = product_key
+    st.session_state.product_rows = df.filter(
+        (F.col("brand") == brand) & (F.col("item") == item)
+    ).toPandas()
+    st.session_state.product_detail = session.table("pricing_detail").filter(
+        (F.col("brand") == brand) & (F.col("item") == item)
+    ).toPandas()
+    st.session_state.previous_prices = {}
+
 # Display and get updated prices from the data editor object
-set_prices = session.create_dataframe(
-    st.data_editor(
-        df.filter((F.col("brand") == brand) & (F.col("item") == item))
-    )
-)
+edited_prices = st.data_editor(st.session_state.product_rows, key=f"editor_{brand}_{item}")
 
 # Add a subheader
 st.subheader("Forecasted Product Demand Based on Price")
 
-# Define model input features
-feature_cols = [
-    "price",
-    "price_change",
-    "base_price",
-    "price_hist_dow",
-    "price_year_dow",
-    "price_month_dow",
-    "price_change_hist_dow",
-    "price_change_year_dow",
-    "price_change_month_dow",
-    "price_hist_roll",
-    "price_year_roll",
-    "price_month_roll",
-    "price_change_hist_roll",
-    "price_change_year_roll",
-    "price_change_month_roll",
-]
-
-# Get demand estimation
-df_demand = set_prices.join(
-    session.table("pricing_detail"), ["brand", "item", "day_of_week"]
-).withColumn("price",F.col("new_price")).withColumn("price_change",F.col("PRICE")- F.col("base_price"))
-
 # Get demand estimator model from registry
 reg = Registry(session=session)
 demand_estimator = reg.get_model("DEMAND_ESTIMATION_MODEL").default
-
-for col in feature_cols :
-        df_demand = df_demand.withColumn(col+"_NEW",F.col(col).cast(T.DoubleType())).drop(col).rename(col+"_NEW",col)
-
-df_demand = demand_estimator.run(df_demand, function_name="predict")\
-    .select(
-    "day_of_week",
-    "current_price_demand",
-    "new_price",
-    "item_cost",
-    "average_basket_profit",
-    "current_price_profit",
-    F.col("demand_estimation").alias("new_price_demand"))
-
-# Demand lift
-demand_lift = df_demand.select(
-    F.round(
-        (
-            (F.sum("new_price_demand") - F.sum("current_price_demand"))
-            / F.sum("current_price_demand")
-        )
-        * 100,
-        1,
-    )
-).collect()[0][0]
-
-# Profit lift
-profit_lift = (
-    df_demand.with_column(
-        "new_price_profit",
-        F.col("new_price_demand")
-        * (F.col("new_price") - F.col("item_cost") + F.col("average_basket_profit")),
-    )
-    .select(
-        F.round(
-            (
-                (F.sum("new_price_profit") - F.sum("current_price_profit"))
-                / F.sum("current_price_profit")
-            )
-            * 100,
-            1,
-        )
-    )
-    .collect()[0][0]
+model_version = getattr(demand_estimator, "version_name", "default")
+
+# Days with a cleared NEW_PRICE are left out of scoring and the KPIs
+priced_prices = priced_rows(edited_prices)
+missing_days = len(edited_prices) - len(priced_prices)
+if missing_days:
+    st.warning(f"{missing_days} day(s) have no NEW_PRICE and are left out of the forecast.")
+if priced_prices.empty:
+    st.stop()
+
+# Score only the rows whose NEW_PRICE changed since the last run; predictions are
+# memoized by model version and feature vector across products and reruns
+prediction_cache = st.session_state.setdefault("prediction_cache", PredictionCache())
+new_price_demand, changed, rows_scored = score_changed(
+    priced_prices,
+    st.session_state.product_detail,
+    demand_estimator,
+    model_version,
+    prediction_cache,
+    st.session_state.previous_prices,
+)
+st.session_state.previous_prices = (
+    priced_prices.set_index("DAY_OF_WEEK")["NEW_PRICE"].astype(float).to_dict()
 )
 
+# Demand and profit lift from the per-day partials
+df_demand = demand_partials(priced_prices, st.session_state.product_detail, new_price_demand)
+demand_lift, profit_lift = lift_kpis(df_demand)
+
 # Show KPIs
 col1, col2 = st.columns(2)
 col1.metric("Total Weekly Demand Lift (%)", demand_lift)
 col2.metric("Total Weekly Profit Lift (%)", profit_lift)
+st.caption(f"{len(changed)} of {len(df_demand)} days changed, {rows_scored} re-scored")
 
 # Plot demand
 st.line_chart(
-    df_demand.with_column("current_price_demand", F.col("current_price_demand") * 0.97),
+    df_demand.reset_index().assign(CURRENT_PRICE_DEMAND=df_demand["CURRENT_PRICE_DEMAND"].to_numpy() * 0.97),
     x="DAY_OF_WEEK",
     y=["NEW_PRICE_DEMAND", "CURRENT_PRICE_DEMAND"],
 )
 
 # Button to submit pricing
-if st.button("Update Prices"):
-    set_prices.with_column("timestamp", F.current_timestamp()).write.mode(
-        "append"
-    ).save_as_table("pricing_final")
+if st.button("Update Prices", disabled=missing_days > 0):
+    session.create_dataframe(edited_prices).with_column(
+        "timestamp", F.current_timestamp()
+    ).write.mode("append").save_as_table("pricing_final")
 
 # Expander to view submitted pricing
 with st.expander("View Submitted Prices"):
-    st.table(session.table("pricing_final").order_by(F.col("timestamp").desc()))
\ No newline at end of file
+    st.table(session.table("pricing_final").order_by(F.col("timestamp").desc()))
@@ -0,0 +1,95 @@
+"""
+Product Picker Render Benchmark
+===============================
+
+Measures how the pricer app's welcome screen and sidebar product picker scale with
+catalog size. For each size, a single brand with that many products is loaded into the
+local backend from load_test_pricing_apps.py and the app is driven through AppTest:
+
+- welcome:      first run (featured product grid)
+- rerun:        second run with unchanged data (render caches warm)
+- select_brand: rerun with the brand selected (paginated product picker)
+
+Reported per size: median script time of each step over --repeats runs and the
+number of elements rendered by the brand rerun (buttons, images, total).
+
+Usage:
+    python benchmark_product_picker.py --sizes 10 50 200 1000 --repeats 5
+"""
+
+import argparse
+import time
+from contextlib import ExitStack
+
+import numpy as np
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from load_test_pricing_apps import (
+    PRICER_APP, LocalBackend, build_catalog, find_widget, patch_environment
+)
+
+
+def count_elements(node):
+    """Number of rendered elements below an AppTest node"""
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return sum(count_elements(child) for child in children.values())
+
+
+def time_run(action):
+    """Seconds taken by one AppTest run"""
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def benchmark_size(n_products, repeats, history_days, timeout):
+    """Median step timings and element counts for a single-brand catalog of n_products"""
+    tables = build_catalog(1, n_products, history_days)
+    brand = tables["pricing"]["BRAND"].iloc[0]
+    timings = {"welcome": [], "rerun": [], "select_brand": []}
+
+    # the app shares its pricing frame across sessions; reload it for this catalog
+    st.cache_resource.clear()
+    with ExitStack() as stack:
+        backend = LocalBackend(tables)
+        patch_environment(stack, backend)
+
+        for _ in range(repeats):
+            at = AppTest.from_file(PRICER_APP, default_timeout=timeout)
+            timings["welcome"].append(time_run(at.run))
+            timings["rerun"].append(time_run(at.run))
+            timings["select_brand"].append(time_run(
+                lambda: find_widget(at.selectbox, "Choose Nike Brand Line").select(brand).run()
+            ))
+
+        elements = {
+            "buttons": len(at.button),
+            "images": len(at.get("imgs")),
+            "total": count_elements(at.main) + count_elements(at.sidebar),
+        }
+
+    return {step: float(np.median(values)) * 1000 for step, values in timings.items()}, elements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product picker render time vs catalog size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000], help="Products per brand")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--history-days", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'products':>9} {'welcome ms':>11} {'rerun ms':>9} {'brand ms':>9} {'buttons':>8} {'images':>7} {'elements':>9}")
+    for size in args.sizes:
+        timings, elements = benchmark_size(size, args.repeats, args.history_days, args.timeout)
+        print(
+            f"{size:>9} {timings['welcome']:>11.1f} {timings['rerun']:>9.1f} {timings['select_brand']:>9.1f} "
+            f"{elements['buttons']:>8} {elements['images']:>7} {elements['total']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
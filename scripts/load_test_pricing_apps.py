@@ -0,0 +1,418 @@
+"""
+Pricing Apps Load Test
+======================
+
+Simulates many merchandisers using the two Streamlit pricing apps at once (e.g. at
+month-end) and reports how they hold up.
+
+Each simulated user drives the real app script through Streamlit's AppTest runner:
+
+- nike_product_pricer_app.py:        load -> select brand -> select product -> select day -> analyze
+- application_monthly_pricing_app.py: load -> select brand -> select product -> edit NEW_PRICE -> submit
+
+AppTest keeps its runtime in process-global state, so concurrent users run in separate
+worker processes (--users of them), each running its sessions one after another. Every
+worker sets up its own local backend instead of Snowflake:
+
+- data:  a Snowpark local-testing session seeded with a synthetic catalog shaped like
+         the tables the setup notebook creates (menu_item_aggregate_dt, pricing,
+         pricing_detail, pricing_final)
+- model: a stub DEMAND_ESTIMATION_MODEL applying a constant price elasticity
+- edits: the NEW_PRICE cell edit is applied to the st.data_editor result, as the
+         browser would send it on rerun
+
+Queries are counted where they execute, on the session connection's execute(): lazy
+table()/sql() DataFrames are not counted until collected, converted or written (this
+includes DataFrames passed to widgets such as st.selectbox). SQL text queries (review
+sentiment) are not supported by the local backend; the apps fall back to their
+"not available" branches, but the attempted executions are still counted.
+
+This is not one Streamlit server handling --users sessions: every user process has its
+own runtime, so st.cache_data / st.cache_resource entries (the shared pricing frame,
+the product-picker render caches) are warmed per user rather than shared, and no
+process sees the memory of the others' sessions. The figures below are per user
+process; they bound script and query cost per session, not server capacity or
+server memory.
+
+Reported: per-step p50/p95/p99 latency, queries per session, peak memory of a single
+user process, and the combined session throughput of the user processes. Each
+process holds its own Streamlit and Snowpark runtime (a few hundred MB), so size
+--users to the machine. Exits with status 1 when throughput falls below
+--min-sessions-per-sec or any session raised an exception.
+
+Requires: streamlit>=1.28, snowflake-snowpark-python[localtest], snowflake-ml-python,
+pandas, numpy (plus the app packages listed in nike_product_pricer_app.py).
+
+Usage:
+    python load_test_pricing_apps.py --app both --users 50 --sessions 200 --min-sessions-per-sec 2
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from snowflake.snowpark import Session
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PRICER_APP = os.path.join(SCRIPTS_DIR, "nike_product_pricer_app.py")
+MONTHLY_APP = os.path.join(SCRIPTS_DIR, "application_monthly_pricing_app.py")
+
+# Session-state key carrying the simulated NEW_PRICE edit
+NEW_PRICE_KEY = "_load_test_new_price"
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# DAY_OF_WEEK labels of the pricing tables, by Snowflake DAYOFWEEK number (Sunday = 0)
+PRICING_DAY_LABELS = {
+    0: '7 - Sunday', 1: '1 - Monday', 2: '2 - Tuesday', 3: '3 - Wednesday',
+    4: '4 - Thursday', 5: '5 - Friday', 6: '6 - Saturday'
+}
+
+FEATURE_COLS = [
+    "PRICE_HIST_DOW", "PRICE_YEAR_DOW", "PRICE_MONTH_DOW",
+    "PRICE_CHANGE_HIST_DOW", "PRICE_CHANGE_YEAR_DOW", "PRICE_CHANGE_MONTH_DOW",
+    "PRICE_HIST_ROLL", "PRICE_YEAR_ROLL", "PRICE_MONTH_ROLL",
+    "PRICE_CHANGE_HIST_ROLL", "PRICE_CHANGE_YEAR_ROLL", "PRICE_CHANGE_MONTH_ROLL",
+]
+
+STUB_ELASTICITY = -1.2
+
+
+def build_catalog(n_brands, n_items, history_days, seed=0):
+    """Generate synthetic pricing tables with the columns the setup notebook creates"""
+    rng = np.random.default_rng(seed)
+    aggregate_rows, detail_rows = [], []
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=history_days)
+    menu_item_id = 0
+
+    for b in range(n_brands):
+        brand = f"Nike Line {b + 1}"
+        for i in range(n_items):
+            menu_item_id += 1
+            item = f"{brand} Product {i + 1}"
+            base_price = round(float(rng.uniform(60, 200)), 2)
+            cost = round(base_price * float(rng.uniform(0.35, 0.6)), 2)
+
+            for date in dates:
+                price = round(base_price * float(rng.uniform(0.85, 1.1)), 2)
+                quantity = int(rng.poisson(40))
+                aggregate_rows.append({
+                    "DATE": date.date(), "DAY_OF_WEEK": (date.dayofweek + 1) % 7, "MENU_TYPE_ID": b + 1,
+                    "TRUCK_BRAND_NAME": brand, "MENU_ITEM_ID": menu_item_id, "MENU_ITEM_NAME": item,
+                    "SALE_PRICE": price, "BASE_PRICE": base_price, "COST_OF_GOODS_USD": cost,
+                    "COUNT_ORDERS": max(quantity - 5, 0), "TOTAL_QUANTITY_SOLD": quantity,
+                    "COMPETITOR_PRICE": f"{price * float(rng.uniform(0.9, 1.1)):.2f}",
+                })
+
+            for dow in range(7):
+                current_price = round(base_price * float(rng.uniform(0.95, 1.05)), 2)
+                recommended_price = round(current_price * float(rng.uniform(0.85, 1.1)), 2)
+                current_demand = int(rng.uniform(20, 80))
+                recommended_demand = int(current_demand * (recommended_price / current_price) ** STUB_ELASTICITY)
+                basket_profit = float(rng.uniform(5, 25))
+                current_profit = current_demand * (basket_profit + current_price - cost)
+                recommended_profit = recommended_demand * (basket_profit + recommended_price - cost)
+                detail = {
+                    "BRAND": brand, "ITEM": item, "DAY_OF_WEEK": PRICING_DAY_LABELS[dow],
+                    "CURRENT_PRICE": current_price, "RECOMMENDED_PRICE": recommended_price,
+                    "CURRENT_PRICE_DEMAND": current_demand, "RECOMMENDED_PRICE_DEMAND": recommended_demand,
+                    "PROFIT_LIFT": round(recommended_profit - current_profit),
+                    "BASE_PRICE": base_price,
+                }
+                for col in FEATURE_COLS:
+                    detail[col] = float(rng.uniform(0.9, 1.1)) * (base_price if "CHANGE" not in col else 0.05)
+                detail.update({
+                    "AVERAGE_BASKET_PROFIT": basket_profit, "ITEM_COST": cost,
+                    "RECOMMENDED_PRICE_PROFIT": recommended_profit, "CURRENT_PRICE_PROFIT": current_profit,
+                })
+                detail_rows.append(detail)
+
+    detail_df = pd.DataFrame(detail_rows)
+    # pricing is the app-facing subset of pricing_detail, with NEW_PRICE starting at the current price
+    pricing_df = detail_df[
+        ["BRAND", "ITEM", "DAY_OF_WEEK", "CURRENT_PRICE", "CURRENT_PRICE", "RECOMMENDED_PRICE", "PROFIT_LIFT"]
+    ].set_axis(
+        ["BRAND", "ITEM", "DAY_OF_WEEK", "NEW_PRICE", "CURRENT_PRICE", "RECOMMENDED_PRICE", "PROFIT_LIFT"], axis=1
+    )
+    return {
+        "nike_po_prod.analytics.menu_item_aggregate_dt": pd.DataFrame(aggregate_rows),
+        "pricing": pricing_df,
+        "pricing_detail": detail_df,
+        # previously submitted prices, so the "View Submitted Prices" expander has data
+        "pricing_final": pricing_df.assign(COMMENT="", TIMESTAMP=pd.Timestamp.now()),
+    }
+
+
+class QueryCounter:
+    """Counts query executions on a Snowpark session's connection"""
+
+    def __init__(self, session):
+        self.queries = 0
+        connection = session._conn
+        execute = connection.execute
+
+        def counted(*args, **kwargs):
+            self.queries += 1
+            return execute(*args, **kwargs)
+        connection.execute = counted
+
+
+class StubModelVersion:
+    """Stand-in for the registry's DEMAND_ESTIMATION_MODEL default version"""
+
+    version_name = "STUB"
+
+    def run(self, df, function_name="predict"):
+        # demand relative to the historical day-of-week price
+        ratio = df["PRICE"] / df["PRICE_HIST_DOW"]
+        return df.assign(DEMAND_ESTIMATION=50.0 * (1.0 + STUB_ELASTICITY * (ratio - 1.0)))
+
+
+class StubRegistry:
+    """Stand-in for snowflake.ml.registry.registry.Registry"""
+
+    def __init__(self, session=None, **kwargs):
+        self.session = session
+
+    def get_model(self, model_name):
+        return mock.Mock(default=StubModelVersion())
+
+
+class LocalBackend:
+    """Local-testing Snowpark session seeded with the catalog, counting query executions"""
+
+    def __init__(self, tables):
+        self.session = Session.builder.config("local_testing", True).create()
+        for name, df in tables.items():
+            self.session.create_dataframe(df).write.mode("overwrite").save_as_table(name)
+        self.counter = QueryCounter(self.session)
+
+    @property
+    def queries(self):
+        return self.counter.queries
+
+
+def patch_environment(stack, backend):
+    """Route the apps' Snowflake session, model registry and data editor to the local stand-ins"""
+    original_data_editor = st.data_editor
+
+    def get_active_session():
+        return backend.session
+
+    def data_editor(data, *args, **kwargs):
+        edited = original_data_editor(data, *args, **kwargs)
+        new_price = st.session_state.get(NEW_PRICE_KEY)
+        if new_price is not None and isinstance(edited, pd.DataFrame) and not edited.empty:
+            price_col = next(c for c in edited.columns if c.upper() == "NEW_PRICE")
+            edited = edited.copy()
+            edited.loc[edited.index[0], price_col] = new_price
+        return edited
+
+    stack.enter_context(mock.patch("snowflake.snowpark.context.get_active_session", get_active_session))
+    stack.enter_context(mock.patch("snowflake.ml.registry.registry.Registry", StubRegistry))
+    stack.enter_context(mock.patch("streamlit.data_editor", data_editor))
+    stack.enter_context(mock.patch.dict(os.environ))
+    os.environ.pop("NIKE_PRICING_SNAPSHOT", None)
+
+
+def find_widget(widgets, label_prefix):
+    """First widget whose label starts with the given prefix"""
+    return next(w for w in widgets if w.label.startswith(label_prefix))
+
+
+def pricer_session(at, rng, catalog):
+    """Scripted flow for nike_product_pricer_app.py, yielding (step, action) pairs"""
+    brand = catalog["brands"][rng.integers(len(catalog["brands"]))]
+
+    def select_product():
+        # the picker renders one page of product cards; pick one of the visible ones
+        visible = [b for b in at.button if b.key and b.key.startswith("select_")]
+        return visible[rng.integers(len(visible))].click().run()
+
+    yield "load", lambda: at.run()
+    yield "select_brand", lambda: find_widget(at.selectbox, "Choose Nike Brand Line").select(brand).run()
+    yield "select_product", select_product
+    yield "select_day", lambda: find_widget(at.selectbox, "Day for price forecasting").select(
+        DAYS_OF_WEEK[rng.integers(7)]).run()
+    yield "analyze", lambda: find_widget(at.button, "🚀 Analyze").click().run()
+
+
+def monthly_session(at, rng, catalog):
+    """Scripted flow for application_monthly_pricing_app.py, yielding (step, action) pairs"""
+    brand = catalog["brands"][rng.integers(len(catalog["brands"]))]
+    item = f"{brand} Product {rng.integers(catalog['items_per_brand']) + 1}"
+
+    def edit_price():
+        at.session_state[NEW_PRICE_KEY] = round(float(rng.uniform(60, 200)), 2)
+        return at.run()
+
+    yield "load", lambda: at.run()
+    yield "select_brand", lambda: find_widget(at.selectbox, "Nike Product Line").select(brand).run()
+    yield "select_product", lambda: find_widget(at.selectbox, "Product").select(item).run()
+    yield "edit_price", edit_price
+    yield "submit", lambda: find_widget(at.button, "Update Prices").click().run()
+
+
+APP_FLOWS = {
+    "pricer": (PRICER_APP, pricer_session),
+    "monthly": (MONTHLY_APP, monthly_session),
+}
+
+
+# Per-process state of a load-test worker, set up by init_worker
+_worker = {}
+
+
+def init_worker(catalog_args, timeout):
+    """Process-pool initializer: build the local backend and patch the environment once"""
+    stack = ExitStack()
+    backend = LocalBackend(build_catalog(*catalog_args))
+    patch_environment(stack, backend)
+    _worker.update(stack=stack, backend=backend, timeout=timeout, baseline_mb=current_rss_mb())
+
+
+def run_session(app, catalog, seed):
+    """Run one simulated user session in this worker, returning latencies, queries and errors"""
+    script, flow = APP_FLOWS[app]
+    backend = _worker["backend"]
+    rng = np.random.default_rng(seed)
+    at = AppTest.from_file(script, default_timeout=_worker["timeout"])
+    queries_before = backend.queries
+    started = time.time()
+
+    latencies, errors = {}, []
+    for step, action in flow(at, rng, catalog):
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            errors.append(f"{step}: {e!r}")
+            break
+        latencies[step] = time.perf_counter() - start
+        if at.exception:
+            errors.append(f"{step}: {at.exception[0].message}")
+            break
+
+    return {
+        "app": app,
+        "latencies": latencies,
+        "queries": backend.queries - queries_before,
+        "errors": errors,
+        "started": started,
+        "finished": time.time(),
+        "pid": os.getpid(),
+        "baseline_mb": _worker["baseline_mb"],
+        "peak_mb": peak_rss_mb(),
+    }
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def summarize(results):
+    """Print the latency / query / memory report and return sessions per second"""
+    step_latencies = defaultdict(list)
+    queries = defaultdict(list)
+    for result in results:
+        queries[result["app"]].append(result["queries"])
+        for step, latency in result["latencies"].items():
+            step_latencies[(result["app"], step)].append(latency * 1000)
+
+    print(f"\n{'app':<8} {'step':<16} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for (app, step), values in step_latencies.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{app:<8} {step:<16} {len(values):>5} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+    print()
+    for app, counts in queries.items():
+        print(f"{app:<8} queries/session: mean {np.mean(counts):.1f}, max {max(counts)}")
+
+    # Throughput over the window sessions were running, excluding worker start-up
+    elapsed = max(r["finished"] for r in results) - min(r["started"] for r in results)
+    completed = sum(1 for r in results if not r["errors"])
+    throughput = completed / elapsed if elapsed else 0.0
+    print(
+        f"\nsessions: {len(results)} ({completed} completed) in {elapsed:.1f}s -> "
+        f"{throughput:.2f} sessions/s across independent user processes"
+    )
+
+    workers = {}
+    for result in results:
+        baseline, peak = workers.get(result["pid"], (result["baseline_mb"], 0.0))
+        workers[result["pid"]] = (baseline, max(peak, result["peak_mb"]))
+    baselines, peaks = zip(*workers.values())
+    print(
+        f"memory per user process ({len(workers)} processes, not server memory): "
+        f"baseline {max(baselines):.0f} MB, peak {max(peaks):.0f} MB"
+    )
+
+    failed = [r for r in results if r["errors"]]
+    for result in failed[:10]:
+        print(f"  {result['app']} error: {result['errors'][0]}")
+    return throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-user load test for the pricing apps")
+    parser.add_argument("--app", default="both", choices=["pricer", "monthly", "both"])
+    parser.add_argument("--users", type=int, default=50, help="Concurrent simulated users")
+    parser.add_argument("--sessions", type=int, default=100, help="Total sessions to run")
+    parser.add_argument("--brands", type=int, default=6)
+    parser.add_argument("--items-per-brand", type=int, default=10)
+    parser.add_argument("--history-days", type=int, default=90)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-step timeout in seconds")
+    parser.add_argument("--min-sessions-per-sec", type=float, default=0.0, help="Fail below this throughput")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog_args = (args.brands, args.items_per_brand, args.history_days, args.seed)
+    catalog = {
+        "brands": [f"Nike Line {b + 1}" for b in range(args.brands)],
+        "items_per_brand": args.items_per_brand,
+    }
+    apps = ["pricer", "monthly"] if args.app == "both" else [args.app]
+
+    # One process per concurrent user; each worker builds its own backend once
+    with ProcessPoolExecutor(
+        max_workers=args.users, initializer=init_worker, initargs=(catalog_args, args.timeout)
+    ) as pool:
+        futures = [
+            pool.submit(run_session, apps[n % len(apps)], catalog, args.seed + n)
+            for n in range(args.sessions)
+        ]
+        results = [f.result() for f in futures]
+
+    throughput = summarize(results)
+
+    if any(r["errors"] for r in results):
+        print("FAIL: sessions raised exceptions")
+        sys.exit(1)
+    if throughput < args.min_sessions_per_sec:
+        print(f"FAIL: throughput {throughput:.2f} sessions/s below floor {args.min_sessions_per_sec:.2f}")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Nike Demand Simulation - Monte Carlo Profit Bands
+=================================================
+
+Draws thousands of demand scenarios per product-day and reports the profit
+distribution at the current and the recommended price, instead of a single
+np.random.normal(100, 20) draw.
+
+- Scenarios are drawn as one (product-days x batch) NumPy array per batch.
+- Demand follows the pricer's model: max(Normal(mean, sd), 10) at the current price,
+  scaled by (recommended / current) ** elasticity at the recommended price. The
+  elasticity is itself drawn per scenario, Normal(elasticity, elasticity_sd), so the
+  recommended price carries its own response risk: with a fixed elasticity both
+  profits are proportional to the same demand draw and the uplift probability could
+  only be 0 or 1. elasticity_sd is the fitted ELASTICITY_SE from
+  nike_elasticity_engine.py, with DEFAULT_ELASTICITY_SE where none was fitted.
+- Quantiles come from a streaming reduction: every batch is binned into fixed-range
+  histograms (mean +/- 6 sd of profit per product-day) that are summed across batches,
+  so memory is O(product-days x bins) no matter how many scenarios are run. Quantiles
+  are accurate to one bin width (range / DEFAULT_BINS).
+- Whole-catalog runs are split into product chunks across a process pool, each with an
+  independent random stream.
+
+Usage:
+    python nike_demand_simulation.py --scenarios 10000 --workers 8 --out profit_bands.parquet
+    python nike_demand_simulation.py --snapshot snapshots/menu_item_aggregate_dt.arrow --out profit_bands.csv
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from nike_elasticity_engine import DEFAULT_ELASTICITY_SE
+from nike_pricing_forecast import forecast_demand_and_price, product_price_and_cost
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_SCENARIOS = 10_000
+DEFAULT_BATCH_SIZE = 2_000
+DEFAULT_BINS = 512
+MIN_DEMAND = 10.0
+RANGE_SDS = 6.0
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+class StreamingHistogram:
+    """Fixed-range per-row histograms accumulated batch by batch"""
+
+    def __init__(self, lower, upper, bins=DEFAULT_BINS):
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.width = np.maximum(np.asarray(upper, dtype=np.float64) - self.lower, 1e-9) / bins
+        self.bins = bins
+        self.counts = np.zeros((len(self.lower), bins), dtype=np.int64)
+        self.total = 0
+        self.sum = np.zeros(len(self.lower))
+
+    def update(self, values):
+        """Add a (rows x batch) array of samples"""
+        rows, batch = values.shape
+        idx = ((values - self.lower[:, None]) / self.width[:, None]).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        flat = idx + (np.arange(rows, dtype=np.int64) * self.bins)[:, None]
+        self.counts += np.bincount(flat.ravel(), minlength=rows * self.bins).reshape(rows, self.bins)
+        self.total += batch
+        self.sum += values.sum(axis=1)
+
+    def mean(self):
+        return self.sum / max(self.total, 1)
+
+    def quantiles(self, qs):
+        """(rows x len(qs)) quantiles, linearly interpolated within bins"""
+        cdf = np.cumsum(self.counts, axis=1) / max(self.total, 1)
+        out = np.empty((len(self.lower), len(qs)))
+        for j, q in enumerate(qs):
+            bin_idx = np.minimum((cdf < q).sum(axis=1), self.bins - 1)
+            rows = np.arange(len(self.lower))
+            prev = np.where(bin_idx > 0, cdf[rows, np.maximum(bin_idx - 1, 0)], 0.0)
+            in_bin = np.maximum(cdf[rows, bin_idx] - prev, 1e-12)
+            frac = np.clip((q - prev) / in_bin, 0.0, 1.0)
+            out[:, j] = self.lower + (bin_idx + frac) * self.width
+        return out
+
+
+def simulate_profit_quantiles(
+    demand_mean, demand_sd, current_price, recommended_price, cost, elasticity,
+    elasticity_sd=DEFAULT_ELASTICITY_SE, n_scenarios=DEFAULT_SCENARIOS, quantiles=DEFAULT_QUANTILES,
+    batch_size=DEFAULT_BATCH_SIZE, bins=DEFAULT_BINS, seed=None
+):
+    """Profit quantiles at current vs. recommended price for arrays of product-days"""
+    demand_mean, demand_sd, current_price, recommended_price, cost, elasticity, elasticity_sd = (
+        np.atleast_1d(np.asarray(a, dtype=np.float64))
+        for a in (demand_mean, demand_sd, current_price, recommended_price, cost, elasticity, elasticity_sd)
+    )
+    n_rows = len(demand_mean)
+    elasticity_sd = np.broadcast_to(elasticity_sd, (n_rows,))
+    log_price_ratio = np.log(recommended_price / current_price)
+    current_margin = current_price - cost
+    recommended_margin = recommended_price - cost
+
+    # Histogram ranges covering +/- RANGE_SDS of the demand and elasticity distributions
+    low_demand = np.maximum(demand_mean - RANGE_SDS * demand_sd, MIN_DEMAND)
+    high_demand = np.maximum(demand_mean + RANGE_SDS * demand_sd, MIN_DEMAND + 1)
+    ratio_ends = np.exp(log_price_ratio * np.stack([
+        elasticity - RANGE_SDS * elasticity_sd, elasticity + RANGE_SDS * elasticity_sd
+    ]))
+
+    def margin_range(margin, scales):
+        ends = np.concatenate([margin * low_demand * scales, margin * high_demand * scales])
+        return ends.min(axis=0), ends.max(axis=0)
+
+    current_hist = StreamingHistogram(*margin_range(current_margin, np.ones((1, n_rows))), bins=bins)
+    recommended_hist = StreamingHistogram(*margin_range(recommended_margin, ratio_ends), bins=bins)
+    uplift_count = np.zeros(n_rows, dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    remaining = n_scenarios
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        demand = rng.normal(demand_mean[:, None], demand_sd[:, None], size=(n_rows, batch))
+        np.maximum(demand, MIN_DEMAND, out=demand)
+        scenario_elasticity = rng.normal(elasticity[:, None], elasticity_sd[:, None], size=(n_rows, batch))
+        demand_ratio = np.exp(log_price_ratio[:, None] * scenario_elasticity)
+        current_profit = current_margin[:, None] * demand
+        recommended_profit = recommended_margin[:, None] * demand * demand_ratio
+
+        current_hist.update(current_profit)
+        recommended_hist.update(recommended_profit)
+        uplift_count += (recommended_profit > current_profit).sum(axis=1)
+        remaining -= batch
+
+    result = {
+        'current_profit_mean': current_hist.mean(),
+        'recommended_profit_mean': recommended_hist.mean(),
+        'prob_profit_uplift': uplift_count / n_scenarios,
+    }
+    for label, hist in (('current', current_hist), ('recommended', recommended_hist)):
+        for q, values in zip(quantiles, hist.quantiles(quantiles).T):
+            result[f'{label}_profit_p{int(round(q * 100))}'] = values
+    return pd.DataFrame(result)
+
+
+def _simulate_chunk(args):
+    """Process-pool worker: simulate one chunk of catalog rows"""
+    chunk, kwargs, seed = args
+    return simulate_profit_quantiles(
+        chunk['demand_mean'], chunk['demand_sd'], chunk['current_price'],
+        chunk['recommended_price'], chunk['cost'], chunk['elasticity'],
+        elasticity_sd=chunk['elasticity_sd'], seed=seed, **kwargs
+    ).set_index(chunk.index)
+
+
+def simulate_catalog(catalog, n_scenarios=DEFAULT_SCENARIOS, workers=None, chunk_size=256, seed=None, **kwargs):
+    """Simulate every product-day of a catalog frame across a process pool
+
+    `catalog` needs demand_mean, demand_sd, current_price, recommended_price, cost,
+    elasticity and elasticity_sd columns (see build_simulation_catalog); the quantile
+    columns are joined onto it.
+    """
+    chunks = [catalog.iloc[i:i + chunk_size] for i in range(0, len(catalog), chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    kwargs = dict(kwargs, n_scenarios=n_scenarios)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_simulate_chunk, [(chunk, kwargs, s) for chunk, s in zip(chunks, seeds)]))
+    return catalog.join(pd.concat(results)) if results else catalog
+
+
+def build_simulation_catalog(pricing_df, elasticity_df=None):
+    """One simulation row per product and day of week, from the pricer's forecast"""
+    rows = []
+    for (brand, product), product_rows in pricing_df.groupby(['TRUCK_BRAND_NAME', 'MENU_ITEM_NAME'], observed=True):
+        current_price, cost = product_price_and_cost(product_rows)
+        for day in DAYS_OF_WEEK:
+            forecast = forecast_demand_and_price(product, brand, day, current_price, elasticity_df)
+            rows.append({
+                'brand_name': brand,
+                'product_name': product,
+                'day_of_week': day,
+                'demand_mean': forecast['demand_mean'],
+                'demand_sd': forecast['demand_sd'],
+                'current_price': current_price,
+                'recommended_price': forecast['recommended_price'],
+                'cost': cost,
+                'elasticity': forecast['price_elasticity'],
+                'elasticity_sd': forecast['elasticity_sd'],
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate profit bands for every product-day of the catalog")
+    parser.add_argument("--snapshot", help="Arrow/Parquet snapshot of menu_item_aggregate_dt instead of Snowflake")
+    parser.add_argument("--scenarios", type=int, default=DEFAULT_SCENARIOS)
+    parser.add_argument("--workers", type=int, default=None, help="Simulation processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="profit_bands.parquet", help="Output .parquet or .csv file")
+    args = parser.parse_args()
+
+    elasticity_df = None
+    if args.snapshot:
+        from nike_data_loader import load_frame
+        pricing_df = load_frame(args.snapshot)
+    else:
+        from snowflake.snowpark.context import get_active_session
+        from nike_data_loader import compact_batches
+        from nike_elasticity_engine import load_latest_elasticities
+
+        session = get_active_session()
+        pricing_df = compact_batches(
+            session.table("nike_po_prod.analytics.menu_item_aggregate_dt").to_pandas_batches(),
+            "menu_item_aggregate_dt"
+        )
+        try:
+            elasticity_df = load_latest_elasticities(session)
+        except Exception:
+            elasticity_df = None
+
+    catalog = build_simulation_catalog(pricing_df, elasticity_df)
+    start = time.perf_counter()
+    bands = simulate_catalog(catalog, n_scenarios=args.scenarios, workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    if args.out.endswith(".csv"):
+        bands.to_csv(args.out, index=False)
+    else:
+        bands.to_parquet(args.out, index=False)
+    print(
+        f"Simulated {len(bands):,} product-days x {args.scenarios:,} scenarios in {elapsed:.1f}s "
+        f"-> {args.out}"
+    )
+    print(f"Median probability of profit uplift: {bands['prob_profit_uplift'].median() * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Nike Elasticity Engine - Per-Product Price Elasticity
+=====================================================
+
+Fits a log-log demand curve, log(quantity) = a + b * log(price), for every
+(menu item, day of week) group of the menu_item_aggregate_dt price/quantity history.
+All groups are solved in one batched NumPy pass: the per-group least-squares sums are
+accumulated with np.bincount, so the whole catalog fits in seconds instead of one
+regression per product.
+
+Sparse or noisy groups are shrunk toward their brand's mean elasticity (empirical Bayes):
+each group's slope is weighted by tau^2 / (tau^2 + se^2), where se^2 is the slope's
+sampling variance and tau^2 the between-group variance within the brand. Groups without
+price variation take the brand mean; brands without any usable group take the prior.
+ELASTICITY_SE is the posterior standard error, sqrt(shrinkage_weight * se^2), or the
+brand's tau for groups that took the brand mean; the profit simulation draws
+elasticities from it.
+
+Fitted coefficients are appended to a versioned table (MODEL_VERSION increments on every
+fit) that the pricer app's forecaster reads.
+
+Usage:
+    python nike_elasticity_engine.py                       # fit from Snowflake and save
+    python nike_elasticity_engine.py --snapshot snapshots/menu_item_aggregate_dt.arrow --dry-run
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+COEF_TABLE = "nike_po_prod.analytics.price_elasticity_coefficients"
+HISTORY_TABLE = "nike_po_prod.analytics.menu_item_aggregate_dt"
+
+DEFAULT_ELASTICITY = -1.2  # prior for brands without usable history
+DEFAULT_ELASTICITY_SE = 0.3  # standard error assumed when no fitted coefficient exists
+DEFAULT_TAU2 = 0.25  # between-group variance when a brand has fewer than two fitted groups
+MIN_OBS = 3
+
+# Snowflake DAYOFWEEK numbering (WEEK_START = 0): Sunday = 0 ... Saturday = 6
+DAY_NUMBERS = {
+    'Sunday': 0, 'Monday': 1, 'Tuesday': 2, 'Wednesday': 3,
+    'Thursday': 4, 'Friday': 5, 'Saturday': 6
+}
+
+
+def fit_elasticities(history, prior_elasticity=DEFAULT_ELASTICITY, min_obs=MIN_OBS):
+    """Fit shrunk log-log elasticities for every (MENU_ITEM_ID, DAY_OF_WEEK) group"""
+    history = history[
+        (history['SALE_PRICE'] > 0) & (history['TOTAL_QUANTITY_SOLD'] > 0) &
+        history[['MENU_ITEM_ID', 'DAY_OF_WEEK', 'TRUCK_BRAND_NAME']].notna().all(axis=1)
+    ]
+    group_idx, groups = pd.MultiIndex.from_frame(history[['MENU_ITEM_ID', 'DAY_OF_WEEK']]).factorize()
+    brand_codes, brands = pd.factorize(history['TRUCK_BRAND_NAME'])
+    n_groups, n_brands = len(groups), len(brands)
+
+    x = np.log(history['SALE_PRICE'].to_numpy(dtype=np.float64))
+    y = np.log(history['TOTAL_QUANTITY_SOLD'].to_numpy(dtype=np.float64))
+
+    def group_sum(weights=None):
+        return np.bincount(group_idx, weights, minlength=n_groups)
+
+    # Per-group least-squares sums, centered
+    n = group_sum().astype(np.float64)
+    x_mean, y_mean = group_sum(x) / n, group_sum(y) / n
+    cxx = group_sum(x * x) - n * x_mean ** 2
+    cxy = group_sum(x * y) - n * x_mean * y_mean
+    cyy = group_sum(y * y) - n * y_mean ** 2
+
+    valid = (n >= min_obs) & (cxx > 1e-12)
+    safe_cxx = np.where(valid, cxx, 1.0)
+    raw_slope = np.where(valid, cxy / safe_cxx, np.nan)
+    dof = np.where(valid, n - 2, 1.0)
+    sigma2 = np.maximum(np.where(valid, cyy - raw_slope * cxy, 0.0), 0.0) / dof
+    se2 = np.where(valid, np.maximum(sigma2, 1e-12) / safe_cxx, np.inf)
+
+    # Brand of each group (groups never span brands)
+    group_brand = np.zeros(n_groups, dtype=np.int64)
+    group_brand[group_idx] = brand_codes
+
+    # Precision-weighted brand means and between-group variances over the valid groups
+    vb = group_brand[valid]
+    s, w = raw_slope[valid], 1.0 / se2[valid]
+    weight_sum = np.bincount(vb, w, minlength=n_brands)
+    brand_count = np.bincount(vb, minlength=n_brands)
+    brand_mean = np.full(n_brands, prior_elasticity, dtype=np.float64)
+    has_groups = weight_sum > 0
+    brand_mean[has_groups] = np.bincount(vb, w * s, minlength=n_brands)[has_groups] / weight_sum[has_groups]
+
+    safe_count = np.maximum(brand_count, 1)
+    slope_var = np.bincount(vb, s * s, minlength=n_brands) / safe_count \
+        - (np.bincount(vb, s, minlength=n_brands) / safe_count) ** 2
+    mean_se2 = np.bincount(vb, se2[valid], minlength=n_brands) / safe_count
+    tau2 = np.where(brand_count >= 2, np.maximum(slope_var - mean_se2, 1e-4), DEFAULT_TAU2)
+
+    # Shrink toward the brand mean
+    shrinkage_weight = np.where(valid, tau2[group_brand] / (tau2[group_brand] + se2), 0.0)
+    elasticity = np.where(
+        valid, shrinkage_weight * raw_slope + (1 - shrinkage_weight) * brand_mean[group_brand],
+        brand_mean[group_brand]
+    )
+    intercept = y_mean - elasticity * x_mean
+    # Posterior variance of the shrunk slope: w * se^2; the brand spread where it was not fitted
+    elasticity_se = np.sqrt(np.where(valid, shrinkage_weight * np.where(valid, se2, 0.0), tau2[group_brand]))
+
+    names = history['MENU_ITEM_NAME'].to_numpy()
+    group_name = np.empty(n_groups, dtype=object)
+    group_name[group_idx] = names
+
+    return pd.DataFrame({
+        'MENU_ITEM_ID': groups.get_level_values(0).to_numpy(),
+        'DAY_OF_WEEK': groups.get_level_values(1).to_numpy(),
+        'TRUCK_BRAND_NAME': np.asarray(brands, dtype=object)[group_brand],
+        'MENU_ITEM_NAME': group_name,
+        'ELASTICITY': elasticity,
+        'RAW_ELASTICITY': raw_slope,
+        'INTERCEPT': intercept,
+        'N_OBS': n.astype(np.int64),
+        'SHRINKAGE_WEIGHT': shrinkage_weight,
+        'ELASTICITY_SE': elasticity_se,
+    })
+
+
+def next_model_version(session, table=COEF_TABLE):
+    """Next MODEL_VERSION for the coefficients table"""
+    latest = session.sql(f"SELECT MAX(model_version) FROM {table}").collect()[0][0]
+    return int(latest or 0) + 1
+
+
+def save_elasticities(session, coef_df, table=COEF_TABLE):
+    """Append fitted coefficients as a new MODEL_VERSION, returning the version"""
+    version = next_model_version(session, table)
+    coef_df = coef_df.assign(MODEL_VERSION=version, FITTED_AT=pd.Timestamp.now())
+    session.create_dataframe(coef_df).write.mode("append").save_as_table(table)
+    return version
+
+
+def load_latest_elasticities(session, table=COEF_TABLE):
+    """Load the coefficients of the latest MODEL_VERSION"""
+    coef_df = session.sql(f"""
+        SELECT *
+        FROM {table}
+        WHERE model_version = (SELECT MAX(model_version) FROM {table})
+    """).toPandas()
+    coef_df.columns = [col.upper() for col in coef_df.columns]
+    return coef_df
+
+
+def load_product_elasticities(session, product_name, brand_name, table=COEF_TABLE):
+    """Load the latest-version coefficients of one product (its 7 day-of-week rows)"""
+    coef_df = session.sql(f"""
+        SELECT *
+        FROM {table}
+        WHERE model_version = (SELECT MAX(model_version) FROM {table})
+          AND menu_item_name = ? AND truck_brand_name = ?
+    """, params=[product_name, brand_name]).toPandas()
+    coef_df.columns = [col.upper() for col in coef_df.columns]
+    return coef_df
+
+
+def _coefficient(coef_df, product_name, brand_name, day_of_week, column, default):
+    """One coefficient column for a product, brand and weekday name, falling back to the default"""
+    if coef_df is None or coef_df.empty or column not in coef_df.columns:
+        return default
+    match = coef_df[
+        (coef_df['MENU_ITEM_NAME'] == product_name) &
+        (coef_df['TRUCK_BRAND_NAME'] == brand_name) &
+        (coef_df['DAY_OF_WEEK'] == DAY_NUMBERS.get(day_of_week, -1))
+    ]
+    if match.empty or pd.isna(match[column].iloc[0]):
+        return default
+    return float(match[column].iloc[0])
+
+
+def lookup_elasticity(coef_df, product_name, brand_name, day_of_week, default=DEFAULT_ELASTICITY):
+    """Elasticity for a product, brand and weekday name ('Monday', ...), falling back to the default"""
+    return _coefficient(coef_df, product_name, brand_name, day_of_week, 'ELASTICITY', default)
+
+
+def lookup_elasticity_se(coef_df, product_name, brand_name, day_of_week, default=DEFAULT_ELASTICITY_SE):
+    """Posterior standard error of that elasticity, falling back to the default"""
+    return _coefficient(coef_df, product_name, brand_name, day_of_week, 'ELASTICITY_SE', default)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit per-product price elasticities")
+    parser.add_argument("--snapshot", help="Arrow/Parquet snapshot of menu_item_aggregate_dt to fit from")
+    parser.add_argument("--dry-run", action="store_true", help="Fit and report without saving")
+    args = parser.parse_args()
+
+    columns = ['DAY_OF_WEEK', 'TRUCK_BRAND_NAME', 'MENU_ITEM_ID', 'MENU_ITEM_NAME',
+               'SALE_PRICE', 'TOTAL_QUANTITY_SOLD']
+    session = None
+    if args.snapshot:
+        from nike_data_loader import load_frame
+        history = load_frame(args.snapshot)[columns]
+    else:
+        from snowflake.snowpark.context import get_active_session
+        session = get_active_session()
+        history = session.table(HISTORY_TABLE).select(columns).toPandas()
+
+    start = time.perf_counter()
+    coef_df = fit_elasticities(history)
+    elapsed = time.perf_counter() - start
+    print(f"Fitted {len(coef_df):,} groups from {len(history):,} rows in {elapsed:.2f}s")
+    print(coef_df.groupby('TRUCK_BRAND_NAME')['ELASTICITY'].describe())
+
+    if not args.dry_run:
+        if session is None:
+            from snowflake.snowpark.context import get_active_session
+            session = get_active_session()
+        version = save_elasticities(session, coef_df)
+        print(f"Saved MODEL_VERSION {version} to {COEF_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Nike Incremental Scoring - Diff-Aware Demand Re-Scoring
+=======================================================
+
+Used by application_monthly_pricing_app.py so that editing one NEW_PRICE cell only
+re-scores that day-of-week row:
+
+1. diff:    compare the edited rows' (DAY_OF_WEEK, NEW_PRICE) with the previous run
+2. memoize: key predictions by model version + the full feature vector, so prices
+            that were already tried (e.g. an edit that is undone) are not re-scored,
+            in a bounded LRU (PredictionCache)
+3. score:   run the demand model only on the changed rows that miss the cache; rows
+            whose NEW_PRICE was cleared are left out (priced_rows)
+4. KPIs:    keep per-row demand/profit partials (current-price demand, cost and basket
+            profit from pricing_detail) and recompute the lifts from them
+
+The model inputs mirror the Snowpark pipeline the app used before: PRICE is the new
+price, PRICE_CHANGE is new price minus base price, all other features come from
+pricing_detail.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_ENTRIES = 500
+
+FEATURE_COLS = [
+    "PRICE",
+    "PRICE_CHANGE",
+    "BASE_PRICE",
+    "PRICE_HIST_DOW",
+    "PRICE_YEAR_DOW",
+    "PRICE_MONTH_DOW",
+    "PRICE_CHANGE_HIST_DOW",
+    "PRICE_CHANGE_YEAR_DOW",
+    "PRICE_CHANGE_MONTH_DOW",
+    "PRICE_HIST_ROLL",
+    "PRICE_YEAR_ROLL",
+    "PRICE_MONTH_ROLL",
+    "PRICE_CHANGE_HIST_ROLL",
+    "PRICE_CHANGE_YEAR_ROLL",
+    "PRICE_CHANGE_MONTH_ROLL",
+]
+
+
+class PredictionCache(OrderedDict):
+    """Prediction memo evicting the least recently used entries beyond max_entries"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+
+def priced_rows(edited):
+    """Edited rows with a NEW_PRICE set; cleared cells would score NaN features on every run"""
+    return edited[pd.to_numeric(edited["NEW_PRICE"], errors="coerce").notna()]
+
+
+def build_features(edited, detail):
+    """Model feature vectors for the edited rows, indexed by DAY_OF_WEEK"""
+    features = edited[["DAY_OF_WEEK", "NEW_PRICE"]].merge(
+        detail.drop(columns=["PRICE", "PRICE_CHANGE", "NEW_PRICE"], errors="ignore"), on="DAY_OF_WEEK"
+    )
+    features["PRICE"] = features["NEW_PRICE"]
+    features["PRICE_CHANGE"] = features["NEW_PRICE"] - features["BASE_PRICE"]
+    return features.set_index("DAY_OF_WEEK")[FEATURE_COLS].astype(np.float64)
+
+
+def feature_key(model_version, feature_row):
+    """Memoization key for one feature vector under a model version"""
+    return (model_version,) + tuple(np.round(feature_row, 6))
+
+
+def changed_days(edited, previous_prices):
+    """Days whose NEW_PRICE differs from the previous run (all days on the first run)"""
+    prices = edited.set_index("DAY_OF_WEEK")["NEW_PRICE"].astype(np.float64)
+    return [day for day, price in prices.items() if previous_prices.get(day) != price]
+
+
+def score_changed(edited, detail, demand_estimator, model_version, cache, previous_prices):
+    """Update `cache` for changed rows, returning (predicted demand per day, changed days, rows scored)"""
+    changed = changed_days(edited, previous_prices)
+    features = build_features(edited, detail)
+    keys = {day: feature_key(model_version, row) for day, row in zip(features.index, features.to_numpy())}
+
+    # Changed rows miss the cache unless the price was tried before; unchanged rows only
+    # miss it when the model version changed
+    to_score = [day for day, key in keys.items() if key not in cache]
+    if to_score:
+        scored = demand_estimator.run(features.loc[to_score].reset_index(drop=True), function_name="predict")
+        for day, demand in zip(to_score, scored["DEMAND_ESTIMATION"].to_numpy()):
+            cache[keys[day]] = float(demand)
+
+    new_price_demand = pd.Series({day: cache[key] for day, key in keys.items()}, name="NEW_PRICE_DEMAND")
+    return new_price_demand, changed, len(to_score)
+
+
+def demand_partials(edited, detail, new_price_demand):
+    """Per-day demand and profit partials used for the lift KPIs and the chart
+
+    Only NEW_PRICE comes from the edited rows; demand, cost and profit at the current
+    price come from pricing_detail.
+    """
+    partials = edited[["DAY_OF_WEEK", "NEW_PRICE"]].merge(
+        detail[["DAY_OF_WEEK", "CURRENT_PRICE_DEMAND", "ITEM_COST", "AVERAGE_BASKET_PROFIT", "CURRENT_PRICE_PROFIT"]],
+        on="DAY_OF_WEEK",
+    ).set_index("DAY_OF_WEEK").astype(np.float64)
+    partials["NEW_PRICE_DEMAND"] = new_price_demand.reindex(partials.index)
+    partials["NEW_PRICE_PROFIT"] = partials["NEW_PRICE_DEMAND"] * (
+        partials["NEW_PRICE"] - partials["ITEM_COST"] + partials["AVERAGE_BASKET_PROFIT"]
+    )
+    return partials.sort_index()
+
+
+def lift_kpis(partials):
+    """Total weekly demand and profit lift (%) from the per-day partials"""
+    totals = partials[["NEW_PRICE_DEMAND", "CURRENT_PRICE_DEMAND", "NEW_PRICE_PROFIT", "CURRENT_PRICE_PROFIT"]].sum()
+    demand_lift = round(
+        (totals["NEW_PRICE_DEMAND"] - totals["CURRENT_PRICE_DEMAND"]) / totals["CURRENT_PRICE_DEMAND"] * 100, 1
+    )
+    profit_lift = round(
+        (totals["NEW_PRICE_PROFIT"] - totals["CURRENT_PRICE_PROFIT"]) / totals["CURRENT_PRICE_PROFIT"] * 100, 1
+    )
+    return demand_lift, profit_lift
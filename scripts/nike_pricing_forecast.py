@@ -0,0 +1,77 @@
+"""
+Nike Pricing Forecast - Demand Forecast and Price Recommendation
+================================================================
+
+Shared by the pricer app and the batch jobs that precompute per product-day outputs
+(e.g. nike_pricing_rationales.py), so both see the same forecast for a product and day.
+"""
+
+import zlib
+
+import numpy as np
+
+from nike_elasticity_engine import lookup_elasticity, lookup_elasticity_se
+
+
+def forecast_demand_and_price(product_name, brand_name, day_of_week, current_price, elasticity_df=None):
+    """Forecast demand and recommend price using ML model simulation"""
+    # Simulate ML model prediction (in real scenario, this would call actual ML model)
+    # Local generator seeded per product and day; crc32 keeps it stable across processes,
+    # unlike hash(), and concurrent sessions never share the global RNG
+    rng = np.random.default_rng(zlib.crc32(f"{product_name}{day_of_week}".encode()))
+    
+    # Base demand factors
+    weekend_multiplier = 1.3 if day_of_week in ['Saturday', 'Sunday'] else 1.0
+    brand_popularity = {
+        'Nike Running': 1.2, 'Nike Jordan': 1.4, 'Nike Sportswear': 1.1,
+        'Nike Training': 1.0, 'Nike SB': 0.9, 'Nike Tech': 1.1
+    }
+    
+    brand_factor = brand_popularity.get(brand_name, 1.0)
+    
+    # Current demand estimation
+    demand_mean = 100 * weekend_multiplier * brand_factor
+    demand_sd = 20 * weekend_multiplier * brand_factor
+    base_demand = rng.normal(demand_mean, demand_sd)
+    base_demand = max(base_demand, 10)  # Minimum demand
+    
+    # Price elasticity (how demand changes with price), fitted per product and day of week
+    price_elasticity = lookup_elasticity(elasticity_df, product_name, brand_name, day_of_week)
+    elasticity_sd = lookup_elasticity_se(elasticity_df, product_name, brand_name, day_of_week)
+    
+    # Optimal price calculation (simplified)
+    optimal_price = current_price * (1 + rng.uniform(-0.15, 0.10))  # ±15% range
+    
+    # Forecasted demand at optimal price
+    price_change_ratio = optimal_price / current_price
+    demand_change = (price_change_ratio ** price_elasticity)
+    forecasted_demand = base_demand * demand_change
+    
+    return {
+        'current_demand': int(base_demand),
+        'forecasted_demand': int(forecasted_demand),
+        'recommended_price': round(optimal_price, 2),
+        'price_change_pct': round((optimal_price - current_price) / current_price * 100, 1),
+        'demand_mean': demand_mean,
+        'demand_sd': demand_sd,
+        'price_elasticity': price_elasticity,
+        'elasticity_sd': elasticity_sd
+    }
+
+
+def calculate_margin(recommended_price, cost):
+    """Calculate expected margin"""
+    margin = recommended_price - cost
+    margin_pct = (margin / recommended_price) * 100 if recommended_price > 0 else 0
+    return margin, margin_pct
+
+
+def product_price_and_cost(product_rows):
+    """Current price and unit cost from a product's latest pricing row by DATE, with the app's defaults"""
+    # Stable sort so the same rows give the same price and cost whatever order they arrive in
+    if 'DATE' in product_rows.columns:
+        product_rows = product_rows.sort_values('DATE', kind='mergesort')
+    product_row = product_rows.iloc[-1]
+    current_price = float(product_row['PRICE']) if 'PRICE' in product_row.index else 150.0
+    cost = float(product_row['COST_OF_GOODS_USD']) if 'COST_OF_GOODS_USD' in product_row.index else current_price * 0.6
+    return current_price, cost
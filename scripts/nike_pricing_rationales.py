@@ -0,0 +1,287 @@
+"""
+Nike Pricing Rationales - Batch-Precomputed LLM Explanations
+============================================================
+
+Generates a short pricing rationale per product-day from the forecast, margin and
+review sentiment, using Snowflake Cortex COMPLETE. Rationales are computed ahead of
+time by a batch job and stored in a cache table keyed by (prompt hash, model); the
+pricer app builds the same prompt for the selected product-day and only reads the
+cache, so no LLM call happens while a merchandiser waits.
+
+- Prompts are built by product_prompt() from rounded values, so the app and the batch
+  job hash identical text for identical inputs.
+- The completion backend is any callable (model, prompt) -> text: cortex_backend()
+  for Snowflake, stub_backend() for tests and throughput benchmarks.
+- Calls run on a thread pool bounded by max_concurrency; cached prompts are skipped.
+  Whole-catalog runs check the cache by MODEL (cached_keys), not by a hash IN list,
+  and generated rows are written every flush_rows completions, so a failure partway
+  through keeps everything generated before it.
+
+Usage:
+    python nike_pricing_rationales.py --concurrency 8                     # Cortex, whole catalog
+    python nike_pricing_rationales.py --backend stub --benchmark-items 2000 --stub-latency 0.2
+"""
+
+import argparse
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from nike_pricing_forecast import calculate_margin, forecast_demand_and_price, product_price_and_cost
+
+CACHE_TABLE = "nike_po_prod.analytics.pricing_rationale_cache"
+DEFAULT_MODEL = "mistral-large"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_FLUSH_ROWS = 100
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def product_prompt(product_name, brand_name, day_of_week, current_price, cost, forecast, sentiment=None):
+    """Rationale prompt for one product-day; `sentiment` is a product_sentiment_pricing_v row or None"""
+    margin, margin_pct = calculate_margin(forecast['recommended_price'], cost)
+
+    if sentiment is not None and pd.notna(sentiment.get('avg_sentiment')):
+        sentiment_line = (
+            f"{sentiment.get('sentiment_category', 'NEUTRAL')} (score {sentiment['avg_sentiment']:.2f}, "
+            f"avg rating {sentiment.get('avg_rating', 0):.1f}/5 from {int(sentiment.get('total_reviews', 0))} reviews, "
+            f"{sentiment.get('recommendation_rate', 0):.0f}% recommend)"
+        )
+    else:
+        sentiment_line = "no review data"
+
+    return (
+        "You are a retail pricing analyst for Nike. In 2-3 sentences, explain the pricing "
+        "recommendation below to a merchandiser, citing the demand forecast, the margin and "
+        "customer sentiment, and end with one concrete action.\n\n"
+        f"Product: {product_name} ({brand_name})\n"
+        f"Day: {day_of_week}\n"
+        f"Current price: ${current_price:.2f}; recommended price: ${forecast['recommended_price']:.2f} "
+        f"({forecast['price_change_pct']:+.1f}%)\n"
+        f"Forecasted demand: {forecast['current_demand']} units at current price, "
+        f"{forecast['forecasted_demand']} units at recommended price "
+        f"(price elasticity {forecast['price_elasticity']:.2f})\n"
+        f"Unit cost: ${cost:.2f}; margin at recommended price: ${margin:.2f} ({margin_pct:.1f}%)\n"
+        f"Customer sentiment: {sentiment_line}\n"
+    )
+
+
+def prompt_hash(prompt):
+    """Cache key for a prompt"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def cortex_backend(session=None):
+    """Completion backend calling Snowflake Cortex COMPLETE"""
+    from snowflake.cortex import complete
+
+    def backend(model, prompt):
+        return complete(model, prompt, session=session)
+    return backend
+
+
+def stub_backend(latency=0.0):
+    """Deterministic local completion backend with a fixed per-call latency"""
+    def backend(model, prompt):
+        time.sleep(latency)
+        return f"[{model} stub] Rationale {prompt_hash(prompt)[:8]}: {prompt.splitlines()[2]}"
+    return backend
+
+
+class MemoryRationaleCache:
+    """In-process rationale cache, for tests and benchmarks"""
+
+    def __init__(self):
+        self._rationales = {}
+
+    def get_many(self, keys):
+        return {key: self._rationales[key] for key in keys if key in self._rationales}
+
+    def cached_keys(self, keys):
+        return {key for key in keys if key in self._rationales}
+
+    def put_many(self, rows):
+        for row in rows:
+            self._rationales[(row['PROMPT_HASH'], row['MODEL'])] = row['RATIONALE']
+
+
+class SnowflakeRationaleCache:
+    """Rationale cache stored in the pricing_rationale_cache table"""
+
+    def __init__(self, session, table=CACHE_TABLE):
+        self.session = session
+        self.table = table
+
+    def get_many(self, keys):
+        """Rationales for a few keys (e.g. the app's selected product-day)"""
+        import snowflake.snowpark.functions as F
+
+        keys = set(keys)
+        if not keys:
+            return {}
+        rows = self.session.table(self.table).filter(
+            F.col("PROMPT_HASH").isin(list({h for h, _ in keys}))
+        ).select("PROMPT_HASH", "MODEL", "RATIONALE").collect()
+        return {
+            (row["PROMPT_HASH"], row["MODEL"]): row["RATIONALE"]
+            for row in rows if (row["PROMPT_HASH"], row["MODEL"]) in keys
+        }
+
+    def cached_keys(self, keys):
+        """Which of many keys are cached, reading only the hash column of their models"""
+        import snowflake.snowpark.functions as F
+
+        keys = set(keys)
+        cached = set()
+        for model in {model for _, model in keys}:
+            rows = self.session.table(self.table).filter(F.col("MODEL") == model).select("PROMPT_HASH").collect()
+            cached.update((row["PROMPT_HASH"], model) for row in rows)
+        return cached & keys
+
+    def put_many(self, rows):
+        if rows:
+            self.session.create_dataframe(pd.DataFrame(rows)).write.mode("append").save_as_table(self.table)
+
+
+def precompute_rationales(
+    items, backend, cache, model=DEFAULT_MODEL, max_concurrency=DEFAULT_CONCURRENCY, flush_rows=DEFAULT_FLUSH_ROWS
+):
+    """Generate and cache rationales for items with product/brand/day/prompt keys, skipping cached prompts"""
+    pending = {}
+    for item in items:
+        pending.setdefault((prompt_hash(item['prompt']), model), item)
+    cached = cache.cached_keys(pending.keys())
+    to_generate = [(key, item) for key, item in pending.items() if key not in cached]
+
+    def generate(entry):
+        (hash_key, model_name), item = entry
+        try:
+            rationale = backend(model_name, item['prompt'])
+        except Exception as e:
+            return None, f"{item['product_name']} / {item['day_of_week']}: {e!r}"
+        return {
+            'PROMPT_HASH': hash_key,
+            'MODEL': model_name,
+            'PRODUCT_NAME': item['product_name'],
+            'BRAND_NAME': item['brand_name'],
+            'DAY_OF_WEEK': item['day_of_week'],
+            'RATIONALE': rationale,
+            'CREATED_AT': pd.Timestamp.now(),
+        }, None
+
+    generated, errors, buffer = 0, [], []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = [pool.submit(generate, entry) for entry in to_generate]
+        try:
+            for future in as_completed(futures):
+                row, error = future.result()
+                if error is not None:
+                    errors.append(error)
+                    continue
+                buffer.append(row)
+                if len(buffer) >= flush_rows:
+                    cache.put_many(buffer)
+                    generated += len(buffer)
+                    buffer = []
+        finally:
+            # keep what was generated even if the run is interrupted
+            if buffer:
+                cache.put_many(buffer)
+                generated += len(buffer)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requested': len(pending),
+        'cached': len(cached),
+        'generated': generated,
+        'errors': errors,
+        'seconds': elapsed,
+        'per_second': generated / elapsed if elapsed else 0.0,
+    }
+
+
+def build_catalog_items(pricing_df, sentiment_df=None, elasticity_df=None):
+    """Prompt items for every product and day of week, matching the pricer app's inputs"""
+    items = []
+    for (brand, product), product_rows in pricing_df.groupby(['TRUCK_BRAND_NAME', 'MENU_ITEM_NAME'], observed=True):
+        current_price, cost = product_price_and_cost(product_rows)
+
+        sentiment = None
+        if sentiment_df is not None and not sentiment_df.empty:
+            match = sentiment_df[(sentiment_df['product_name'] == product) & (sentiment_df['brand_name'] == brand)]
+            sentiment = match.iloc[0] if not match.empty else None
+
+        for day in DAYS_OF_WEEK:
+            forecast = forecast_demand_and_price(product, brand, day, current_price, elasticity_df)
+            items.append({
+                'product_name': product,
+                'brand_name': brand,
+                'day_of_week': day,
+                'prompt': product_prompt(product, brand, day, current_price, cost, forecast, sentiment),
+            })
+    return items
+
+
+def benchmark_items(n_items):
+    """Synthetic prompt items for backend throughput benchmarks"""
+    pricing_df = pd.DataFrame({
+        'TRUCK_BRAND_NAME': [f"Nike Line {i % 6 + 1}" for i in range(n_items // 7 + 1)],
+        'MENU_ITEM_NAME': [f"Benchmark Product {i + 1}" for i in range(n_items // 7 + 1)],
+        'PRICE': [100.0 + i % 50 for i in range(n_items // 7 + 1)],
+    })
+    return build_catalog_items(pricing_df)[:n_items]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute cached LLM pricing rationales")
+    parser.add_argument("--backend", default="cortex", choices=["cortex", "stub"])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent completion calls")
+    parser.add_argument("--flush-rows", type=int, default=DEFAULT_FLUSH_ROWS, help="Rows written to the cache per flush")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds per stub completion")
+    parser.add_argument("--benchmark-items", type=int, help="Run on N synthetic items with an in-memory cache")
+    args = parser.parse_args()
+
+    if args.benchmark_items:
+        items = benchmark_items(args.benchmark_items)
+        cache = MemoryRationaleCache()
+        backend = stub_backend(args.stub_latency) if args.backend == "stub" else cortex_backend()
+    else:
+        from snowflake.snowpark.context import get_active_session
+        from nike_data_loader import compact_batches
+        from nike_elasticity_engine import load_latest_elasticities
+
+        session = get_active_session()
+        pricing_df = compact_batches(
+            session.table("nike_po_prod.analytics.menu_item_aggregate_dt").to_pandas_batches(),
+            "menu_item_aggregate_dt"
+        )
+        sentiment_df = session.sql("""
+            SELECT product_name, brand_name, avg_sentiment, avg_rating, total_reviews,
+                   recommendation_rate, sentiment_category
+            FROM nike_reviews.analytics.product_sentiment_pricing_v
+        """).toPandas()
+        sentiment_df.columns = [col.lower() for col in sentiment_df.columns]
+        try:
+            elasticity_df = load_latest_elasticities(session)
+        except Exception:
+            elasticity_df = None
+
+        items = build_catalog_items(pricing_df, sentiment_df, elasticity_df)
+        cache = SnowflakeRationaleCache(session)
+        backend = stub_backend(args.stub_latency) if args.backend == "stub" else cortex_backend(session)
+
+    stats = precompute_rationales(items, backend, cache, args.model, args.concurrency, args.flush_rows)
+    print(
+        f"{stats['requested']} prompts: {stats['cached']} cached, {stats['generated']} generated, "
+        f"{len(stats['errors'])} failed in {stats['seconds']:.1f}s ({stats['per_second']:.1f}/s)"
+    )
+    for error in stats['errors'][:10]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
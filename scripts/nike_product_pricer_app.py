@@ -12,6 +12,7 @@ Required Packages (Compatible versions for Snowflake Python 3.10 runtime):
 - streamlit (built-in)
 - snowflake-snowpark-python (built-in)
 - snowflake-ml-python==1.4.0
+- pyarrow (used by nike_data_loader.py)
 
 Note: Add these packages via Snowflake UI when deploying the Streamlit app:
 Projects → Streamlit → Package dropdown → Add packages
@@ -19,9 +20,10 @@ Projects → Streamlit → Package dropdown → Add packages
 Use the exact versions listed above to avoid compatibility issues.
 """
 
+import os
+import zlib
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -37,7 +39,12 @@ warnings.filterwarnings('ignore')
 
 from snowflake.snowpark.context import get_active_session
 import snowflake.snowpark.functions as F
-from snowflake.cortex import complete
+
+from nike_data_loader import compact_batches, load_frame
+from nike_elasticity_engine import load_product_elasticities
+from nike_pricing_forecast import forecast_demand_and_price, calculate_margin, product_price_and_cost
+from nike_pricing_rationales import DEFAULT_MODEL, SnowflakeRationaleCache, product_prompt, prompt_hash
+from nike_demand_simulation import simulate_profit_quantiles
 
 # Page configuration
 st.set_page_config(
@@ -76,12 +83,23 @@ st.markdown("""
         border: 1px solid #e1e5e9;
         margin: 0.5rem 0;
     }
+    .product-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 10px;
+    }
     .sentiment-positive { color: #28a745; font-weight: bold; }
     .sentiment-negative { color: #dc3545; font-weight: bold; }
     .sentiment-neutral { color: #ffc107; font-weight: bold; }
 </style>
 """, unsafe_allow_html=True)
 
+PRODUCTS_PER_PAGE = 6
+PRICING_DATA_TTL = 900  # seconds before the shared pricing frame is reloaded
+SENTIMENT_CUBE_TTL = 900  # seconds before a product's cube cells are re-read
+ELASTICITY_TTL = 900  # seconds before a product's fitted elasticities are re-read
+FEATURED_PRODUCT_COUNT = 6
+
 def get_session():
     """Get active Snowflake session"""
     try:
@@ -90,16 +108,32 @@ def get_session():
         st.error("Unable to connect to Snowflake. Please ensure you're running in a Snowflake environment.")
         st.stop()
 
+@st.cache_resource(ttl=PRICING_DATA_TTL, show_spinner=False)
+def fetch_pricing_data(_session, snapshot_path):
+    """Pricing data in the compact column layout with its product catalog and data version,
+    shared read-only across sessions and reruns"""
+    if snapshot_path:
+        # Memory-mapped snapshot written by nike_data_loader.py
+        pricing_df = load_frame(snapshot_path)
+    else:
+        # Compact batch by batch instead of materializing the wide toPandas() frame
+        batches = _session.table("nike_po_prod.analytics.menu_item_aggregate_dt").to_pandas_batches()
+        pricing_df = compact_batches(batches, "menu_item_aggregate_dt")
+    
+    # Built once per load rather than on every rerun
+    catalog, data_version = build_product_catalog(pricing_df)
+    return pricing_df, catalog, data_version
+
 def load_pricing_data():
-    """Load pricing data from Snowflake"""
-    session = get_session()
+    """Load pricing data, its product catalog and data version from Snowflake, or from a
+    local Arrow snapshot when configured"""
+    snapshot_path = os.environ.get("NIKE_PRICING_SNAPSHOT")
+    session = None if snapshot_path else get_session()
     try:
-        # Load pricing data
-        pricing_df = session.table("nike_po_prod.analytics.menu_item_aggregate_dt").toPandas()
-        return pricing_df
+        return fetch_pricing_data(session, snapshot_path)
     except Exception as e:
         st.error(f"Error loading pricing data: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame(columns=['TRUCK_BRAND_NAME', 'MENU_ITEM_NAME']), 0
 
 def load_review_data():
     """Load review and sentiment data"""
@@ -135,6 +169,69 @@ def load_review_data():
         st.warning(f"Review data not available: {e}")
         return pd.DataFrame(), pd.DataFrame()
 
+@st.cache_data(ttl=SENTIMENT_CUBE_TTL, show_spinner=False)
+def fetch_sentiment_cube(_session, product_name, brand_name):
+    """A product's weekly pre-aggregated review cells (source x language x week)"""
+    cube_df = _session.sql("""
+        SELECT 
+            source,
+            language,
+            week_start,
+            review_count,
+            sentiment_sum,
+            rating_sum,
+            recommend_count
+        FROM nike_reviews.analytics.review_sentiment_weekly_cube
+        WHERE product_name = ? AND brand_name = ?
+    """, params=[product_name, brand_name]).toPandas()
+    cube_df.columns = [col.lower() for col in cube_df.columns]
+    cube_df['week_start'] = pd.to_datetime(cube_df['week_start']).dt.date
+    return cube_df
+
+def load_sentiment_cube(product_name, brand_name):
+    """Load a product's cube cells, cached per product"""
+    session = get_session()
+    try:
+        return fetch_sentiment_cube(session, product_name, brand_name)
+    except Exception as e:
+        st.warning(f"Sentiment rollup cube not available: {e}")
+        return pd.DataFrame()
+
+def filter_sentiment_cube(cube_df, start_date=None, end_date=None):
+    """Limit a product's cube cells to a week range"""
+    if cube_df.empty:
+        return cube_df
+    
+    mask = pd.Series(True, index=cube_df.index)
+    if start_date is not None:
+        mask &= cube_df['week_start'] >= start_date
+    if end_date is not None:
+        mask &= cube_df['week_start'] <= end_date
+    return cube_df[mask]
+
+@st.cache_data(ttl=ELASTICITY_TTL, show_spinner=False)
+def fetch_price_elasticities(_session, product_name, brand_name):
+    """Latest fitted day-of-week elasticities of one product"""
+    return load_product_elasticities(_session, product_name, brand_name)
+
+def load_price_elasticities(product_name, brand_name):
+    """Load a product's latest fitted per-day price elasticities, cached per product"""
+    session = get_session()
+    try:
+        return fetch_price_elasticities(session, product_name, brand_name)
+    except Exception as e:
+        st.warning(f"Fitted price elasticities not available, using default: {e}")
+        return pd.DataFrame()
+
+def load_pricing_rationale(prompt, model=DEFAULT_MODEL):
+    """Read a precomputed pricing rationale from the cache (no live LLM call)"""
+    session = get_session()
+    try:
+        key = (prompt_hash(prompt), model)
+        return SnowflakeRationaleCache(session).get_many([key]).get(key)
+    except Exception:
+        return None
+
 def get_product_image_url(product_name):
     """Get product image URL"""
     # In a real scenario, this would query the product database
@@ -150,47 +247,40 @@ def get_product_image_url(product_name):
     }
     return image_mapping.get(product_name, "https://via.placeholder.com/200x200?text=Nike+Product")
 
-def forecast_demand_and_price(product_name, brand_name, day_of_week, current_price):
-    """Forecast demand and recommend price using ML model simulation"""
-    # Simulate ML model prediction (in real scenario, this would call actual ML model)
-    np.random.seed(hash(product_name + str(day_of_week)) % 2**32)
-    
-    # Base demand factors
-    weekend_multiplier = 1.3 if day_of_week in ['Saturday', 'Sunday'] else 1.0
-    brand_popularity = {
-        'Nike Running': 1.2, 'Nike Jordan': 1.4, 'Nike Sportswear': 1.1,
-        'Nike Training': 1.0, 'Nike SB': 0.9, 'Nike Tech': 1.1
-    }
-    
-    brand_factor = brand_popularity.get(brand_name, 1.0)
-    
-    # Current demand estimation
-    base_demand = np.random.normal(100, 20) * weekend_multiplier * brand_factor
-    base_demand = max(base_demand, 10)  # Minimum demand
-    
-    # Price elasticity (how demand changes with price)
-    price_elasticity = -1.2  # Typical elasticity for athletic footwear
+def build_product_catalog(pricing_df):
+    """One row per brand/product, plus a data version used to key render caches"""
+    if not {'TRUCK_BRAND_NAME', 'MENU_ITEM_NAME'}.issubset(pricing_df.columns):
+        return pd.DataFrame(columns=['TRUCK_BRAND_NAME', 'MENU_ITEM_NAME']), 0
     
-    # Optimal price calculation (simplified)
-    optimal_price = current_price * (1 + np.random.uniform(-0.15, 0.10))  # ±15% range
-    
-    # Forecasted demand at optimal price
-    price_change_ratio = optimal_price / current_price
-    demand_change = (price_change_ratio ** price_elasticity)
-    forecasted_demand = base_demand * demand_change
-    
-    return {
-        'current_demand': int(base_demand),
-        'forecasted_demand': int(forecasted_demand),
-        'recommended_price': round(optimal_price, 2),
-        'price_change_pct': round((optimal_price - current_price) / current_price * 100, 1)
-    }
+    cols = [col for col in ['TRUCK_BRAND_NAME', 'MENU_ITEM_NAME', 'PRICE'] if col in pricing_df.columns]
+    catalog = pricing_df[cols].drop_duplicates(['TRUCK_BRAND_NAME', 'MENU_ITEM_NAME']).reset_index(drop=True)
+    data_version = int(pd.util.hash_pandas_object(catalog, index=False).sum())
+    return catalog, data_version
 
-def calculate_margin(recommended_price, cost):
-    """Calculate expected margin"""
-    margin = recommended_price - cost
-    margin_pct = (margin / recommended_price) * 100 if recommended_price > 0 else 0
-    return margin, margin_pct
+@st.cache_data(show_spinner=False)
+def get_brand_products(data_version, _catalog, brand_name):
+    """Product names for a brand, cached per data version"""
+    return _catalog.loc[_catalog['TRUCK_BRAND_NAME'] == brand_name, 'MENU_ITEM_NAME'].tolist()
+
+@st.cache_data(show_spinner=False)
+def get_featured_products_html(data_version, _catalog, n_products=FEATURED_PRODUCT_COUNT):
+    """Featured product grid HTML, sampled and rendered once per data version"""
+    featured = _catalog.sample(min(n_products, len(_catalog)), random_state=data_version % 2**32)
+    
+    cards = []
+    for _, product in featured.iterrows():
+        product_name = product.get('MENU_ITEM_NAME', 'Nike Product')
+        brand_name = product.get('TRUCK_BRAND_NAME', 'Nike')
+        price = product.get('PRICE', 0)
+        cards.append(f"""
+        <div class="product-card">
+            <img src="{get_product_image_url(product_name)}" width="120" height="120" style="object-fit: cover; border-radius: 5px;">
+            <h5>{product_name}</h5>
+            <p><strong>{brand_name}</strong></p>
+            <p>${price:.2f}</p>
+        </div>
+        """)
+    return f'<div class="product-grid">{"".join(cards)}</div>'
 
 def create_sentiment_wordcloud(reviews_text):
     """Create word cloud from reviews"""
@@ -219,7 +309,7 @@ def create_sentiment_wordcloud(reviews_text):
         st.warning(f"Could not generate word cloud: {e}")
         return None
 
-def create_sentiment_charts(sentiment_data, reviews_data, product_name):
+def create_sentiment_charts(sentiment_data, reviews_data, product_name, cube_data=None):
     """Create sentiment visualization charts"""
     fig = make_subplots(
         rows=2, cols=2,
@@ -262,6 +352,30 @@ def create_sentiment_charts(sentiment_data, reviews_data, product_name):
                 row=1, col=2
             )
     
+    # Sentiment over time and review sources, rolled up from the weekly cube cells
+    if cube_data is not None and not cube_data.empty:
+        weekly = cube_data.groupby('week_start')[['review_count', 'sentiment_sum']].sum().sort_index()
+        fig.add_trace(
+            go.Scatter(
+                x=weekly.index,
+                y=weekly['sentiment_sum'] / weekly['review_count'],
+                mode='lines+markers',
+                marker_color='#1f77b4',
+                name="Avg Weekly Sentiment"
+            ),
+            row=2, col=1
+        )
+        
+        source_counts = cube_data.groupby('source')['review_count'].sum()
+        fig.add_trace(
+            go.Pie(
+                labels=source_counts.index,
+                values=source_counts.values,
+                name="Sources"
+            ),
+            row=2, col=2
+        )
+    
     # Update layout
     fig.update_layout(
         height=600,
@@ -279,7 +393,7 @@ def main():
     
     # Load data
     with st.spinner("Loading product data..."):
-        pricing_df = load_pricing_data()
+        pricing_df, catalog, data_version = load_pricing_data()
         sentiment_df, reviews_df = load_review_data()
     
     if pricing_df.empty:
@@ -292,7 +406,7 @@ def main():
         
         # Step 1: Brand Selection
         st.subheader("1. Select Brand Line")
-        available_brands = sorted(pricing_df['TRUCK_BRAND_NAME'].unique()) if 'TRUCK_BRAND_NAME' in pricing_df.columns else []
+        available_brands = sorted(catalog['TRUCK_BRAND_NAME'].unique())
         selected_brand = st.selectbox(
             "Choose Nike Brand Line:",
             available_brands,
@@ -303,38 +417,36 @@ def main():
             # Step 2: Product Selection with Images
             st.subheader("2. Select Product")
             
-            # Filter products for selected brand
-            brand_products = pricing_df[pricing_df['TRUCK_BRAND_NAME'] == selected_brand]['MENU_ITEM_NAME'].unique()
+            # Products for selected brand, narrowed by search
+            brand_products = get_brand_products(data_version, catalog, selected_brand)
+            search = st.text_input("Search products:", key=f"product_search_{selected_brand}")
+            if search:
+                brand_products = [p for p in brand_products if search.lower() in str(p).lower()]
             
-            # Create product selection with images
-            st.write("Choose a product:")
+            # Only the current page of product cards is rendered
+            n_pages = max(1, -(-len(brand_products) // PRODUCTS_PER_PAGE))
+            page = 1
+            if n_pages > 1:
+                page = st.number_input(
+                    f"Page (1-{n_pages}):",
+                    min_value=1, max_value=n_pages, value=1, step=1,
+                    key=f"product_page_{selected_brand}_{search}"
+                )
+            page_start = (page - 1) * PRODUCTS_PER_PAGE
+            page_products = brand_products[page_start:page_start + PRODUCTS_PER_PAGE]
             
-            # Create a visual product selector
-            product_options = []
-            for product in brand_products:
-                image_url = get_product_image_url(product)
-                product_options.append({
-                    'name': product,
-                    'image': image_url
-                })
+            st.write(f"Choose a product ({len(brand_products)} available):")
             
             # Display products in a grid with selection
             cols = st.columns(2)
             selected_product = None
             
-            for i, product_info in enumerate(product_options):
-                with cols[i % 2]:
-                    # Create a container for each product
-                    container = st.container()
-                    with container:
-                        col_img, col_text = st.columns([1, 2])
-                        with col_img:
-                            st.image(product_info['image'], width=100)
-                        with col_text:
-                            st.write(f"**{product_info['name']}**")
-                            if st.button(f"Select", key=f"select_{i}", use_container_width=True):
-                                selected_product = product_info['name']
-                                st.session_state.selected_product_temp = product_info['name']
+            for i, product in enumerate(page_products, start=page_start):
+                with cols[(i - page_start) % 2]:
+                    st.image(get_product_image_url(product), width=100)
+                    if st.button(f"{product}", key=f"select_{i}", use_container_width=True):
+                        selected_product = product
+                        st.session_state.selected_product_temp = product
             
             # Use session state to persist selection
             if hasattr(st.session_state, 'selected_product_temp'):
@@ -374,8 +486,7 @@ def main():
         ]
         
         if not product_data.empty:
-            current_price = float(product_data['PRICE'].iloc[0]) if 'PRICE' in product_data.columns else 150.0
-            cost = float(product_data['COST_OF_GOODS_USD'].iloc[0]) if 'COST_OF_GOODS_USD' in product_data.columns else current_price * 0.6
+            current_price, cost = product_price_and_cost(product_data)
         else:
             current_price = 150.0  # Default price
             cost = 90.0  # Default cost
@@ -398,7 +509,8 @@ def main():
             st.metric("Analysis Day", day)
             
             # Get forecast
-            forecast = forecast_demand_and_price(product, brand, day, current_price)
+            elasticity_df = load_price_elasticities(product, brand)
+            forecast = forecast_demand_and_price(product, brand, day, current_price, elasticity_df)
             margin, margin_pct = calculate_margin(forecast['recommended_price'], cost)
             
             st.metric(
@@ -487,8 +599,22 @@ def main():
             with col2:
                 st.subheader("Sentiment Analytics")
                 
+                # Date-range filter over the product's weekly cube cells
+                product_cube = load_sentiment_cube(product, brand)
+                if not product_cube.empty:
+                    first_week = product_cube['week_start'].min()
+                    last_week = product_cube['week_start'].max()
+                    review_period = st.date_input(
+                        "Review period:",
+                        value=(first_week, last_week),
+                        min_value=first_week,
+                        max_value=last_week
+                    )
+                    if isinstance(review_period, (list, tuple)) and len(review_period) == 2:
+                        product_cube = filter_sentiment_cube(product_cube, review_period[0], review_period[1])
+                
                 # Create and display sentiment charts
-                sentiment_chart = create_sentiment_charts(product_sentiment, product_reviews, product)
+                sentiment_chart = create_sentiment_charts(product_sentiment, product_reviews, product, product_cube)
                 st.plotly_chart(sentiment_chart, use_container_width=True)
         
         else:
@@ -551,10 +677,44 @@ def main():
                 f"${profit_change:+.2f}",
                 delta=f"{profit_change_pct:+.1f}%"
             )
+            
+            # Monte Carlo demand uncertainty
+            if st.checkbox("🎲 Simulate demand uncertainty", help="Draw demand scenarios to see the profit risk"):
+                n_scenarios = st.select_slider(
+                    "Demand scenarios:",
+                    options=[1000, 5000, 10000, 50000, 100000],
+                    value=10000
+                )
+                simulation = simulate_profit_quantiles(
+                    forecast['demand_mean'], forecast['demand_sd'], current_price,
+                    forecast['recommended_price'], cost, forecast['price_elasticity'],
+                    elasticity_sd=forecast['elasticity_sd'], n_scenarios=n_scenarios, seed=zlib.crc32(f"{product}{day}".encode())
+                ).iloc[0]
+                
+                profit_bands = pd.DataFrame({
+                    'Scenario': ['Current Strategy', 'Recommended Strategy'],
+                    'P5': [simulation['current_profit_p5'], simulation['recommended_profit_p5']],
+                    'P50': [simulation['current_profit_p50'], simulation['recommended_profit_p50']],
+                    'P95': [simulation['current_profit_p95'], simulation['recommended_profit_p95']],
+                    'Mean': [simulation['current_profit_mean'], simulation['recommended_profit_mean']]
+                }).set_index('Scenario')
+                st.dataframe(profit_bands.style.format("${:,.2f}"), use_container_width=True)
+                st.metric(
+                    "Probability of Profit Uplift",
+                    f"{simulation['prob_profit_uplift'] * 100:.1f}%"
+                )
         
         # Action recommendations
         st.header("🚀 Action Recommendations")
         
+        # Precomputed LLM rationale for this product-day (see nike_pricing_rationales.py)
+        rationale = load_pricing_rationale(product_prompt(
+            product, brand, day, current_price, cost, forecast,
+            product_sentiment.iloc[0] if not product_sentiment.empty else None
+        ))
+        if rationale:
+            st.info(f"🤖 {rationale}")
+        
         recommendations = []
         
         if price_change > 5:
@@ -599,26 +759,8 @@ def main():
         if not pricing_df.empty:
             st.subheader("🌟 Featured Nike Products")
             
-            # Sample products
-            sample_products = pricing_df.sample(min(6, len(pricing_df)))
-            
-            cols = st.columns(3)
-            for i, (_, product) in enumerate(sample_products.iterrows()):
-                with cols[i % 3]:
-                    product_name = product.get('MENU_ITEM_NAME', 'Nike Product')
-                    brand_name = product.get('TRUCK_BRAND_NAME', 'Nike')
-                    price = product.get('PRICE', 0)
-                    
-                    image_url = get_product_image_url(product_name)
-                    
-                    st.markdown(f"""
-                    <div class="product-card">
-                        <img src="{image_url}" width="120" height="120" style="object-fit: cover; border-radius: 5px;">
-                        <h5>{product_name}</h5>
-                        <p><strong>{brand_name}</strong></p>
-                        <p>${price:.2f}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # Featured cards are sampled and rendered once per data version
+            st.markdown(get_featured_products_html(data_version, catalog), unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
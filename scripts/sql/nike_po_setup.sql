@@ -727,6 +727,37 @@ CREATE OR REPLACE VIEW nike_po_prod.analytics.menu_item_aggregate_dt
 SELECT * FROM nike_po_prod.harmonized.menu_item_aggregate_dt;
 
 
+--> price_elasticity_coefficients
+-- Versioned per (menu item, day of week) log-log elasticities written by scripts/nike_elasticity_engine.py
+CREATE OR REPLACE TABLE nike_po_prod.analytics.price_elasticity_coefficients
+(
+    MENU_ITEM_ID NUMBER(38,0),
+    DAY_OF_WEEK NUMBER(2,0),
+    TRUCK_BRAND_NAME VARCHAR(16777216),
+    MENU_ITEM_NAME VARCHAR(16777216),
+    ELASTICITY FLOAT,
+    RAW_ELASTICITY FLOAT,
+    INTERCEPT FLOAT,
+    N_OBS NUMBER(18,0),
+    SHRINKAGE_WEIGHT FLOAT,
+    ELASTICITY_SE FLOAT,
+    MODEL_VERSION NUMBER(18,0),
+    FITTED_AT TIMESTAMP_NTZ(9)
+);
+
+--> pricing_rationale_cache
+-- Cortex COMPLETE pricing rationales per product-day, precomputed by scripts/nike_pricing_rationales.py
+CREATE OR REPLACE TABLE nike_po_prod.analytics.pricing_rationale_cache
+(
+    PROMPT_HASH VARCHAR(64),
+    MODEL VARCHAR(16777216),
+    PRODUCT_NAME VARCHAR(16777216),
+    BRAND_NAME VARCHAR(16777216),
+    DAY_OF_WEEK VARCHAR(16),
+    RATIONALE VARCHAR(16777216),
+    CREATED_AT TIMESTAMP_NTZ(9)
+);
+
 --> menu_item_cogs_and_price_v
 CREATE OR REPLACE VIEW nike_po_prod.analytics.menu_item_cogs_and_price_v
 	AS
@@ -1140,6 +1171,115 @@ GRANT ALL ON VIEW nike_reviews.analytics.product_sentiment_pricing_v TO ROLE nik
 
 SELECT 'Product sentiment pricing view created successfully!' AS view_status;
 
+/*--
+ • weekly sentiment rollup cube (product x source x language x week)
+--*/
+-- Pre-aggregated review cells for the "Sentiment Over Time" / "Review Sources" charts
+-- and date-range filters in the Streamlit app. Averages are derived from the sums
+-- (sentiment_sum / review_count) so cells can be re-bucketed without touching raw reviews.
+CREATE OR REPLACE TABLE nike_reviews.analytics.review_sentiment_weekly_cube
+(
+    product_id NUMBER(38,0),
+    product_name VARCHAR(16777216),
+    brand_name VARCHAR(16777216),
+    source VARCHAR(16777216),
+    language VARCHAR(16777216),
+    week_start DATE,
+    review_count NUMBER(18,0),
+    sentiment_sum FLOAT,
+    rating_sum NUMBER(38,1),
+    recommend_count NUMBER(18,0),
+    last_updated TIMESTAMP_NTZ(9)
+);
+
+-- backfill the cube from the reviews loaded above
+INSERT INTO nike_reviews.analytics.review_sentiment_weekly_cube
+SELECT
+    r.product_id,
+    p.product_name,
+    p.brand_name,
+    COALESCE(r.source, 'unknown') AS source,
+    COALESCE(r.language, 'unknown') AS language,
+    DATE_TRUNC('week', r.review_date) AS week_start,
+    COUNT(*) AS review_count,
+    SUM(SNOWFLAKE.CORTEX.SENTIMENT(
+        CASE
+            WHEN r.language = 'en' THEN r.review_text
+            ELSE SNOWFLAKE.CORTEX.TRANSLATE(r.review_text, r.language, 'en')
+        END
+    )) AS sentiment_sum,
+    SUM(r.rating) AS rating_sum,
+    COUNT(CASE WHEN r.rating >= 4.0 THEN 1 END) AS recommend_count,
+    CURRENT_TIMESTAMP()::TIMESTAMP_NTZ AS last_updated
+FROM nike_reviews.raw_support.product_reviews r
+JOIN nike_reviews.raw_pos.products p
+    ON p.product_id = r.product_id
+GROUP BY 1, 2, 3, 4, 5, 6;
+
+-- capture reviews inserted after the backfill
+CREATE OR REPLACE STREAM nike_reviews.raw_support.product_reviews_cube_stream
+    ON TABLE nike_reviews.raw_support.product_reviews
+    APPEND_ONLY = TRUE;
+
+-- merge only the new reviews into their cells (sentiment is scored once per review)
+CREATE OR REPLACE TASK nike_reviews.analytics.review_sentiment_cube_refresh_task
+    WAREHOUSE = nike_ds_wh
+    SCHEDULE = '60 MINUTE'
+WHEN SYSTEM$STREAM_HAS_DATA('nike_reviews.raw_support.product_reviews_cube_stream')
+AS
+MERGE INTO nike_reviews.analytics.review_sentiment_weekly_cube c
+USING (
+    SELECT
+        r.product_id,
+        p.product_name,
+        p.brand_name,
+        COALESCE(r.source, 'unknown') AS source,
+        COALESCE(r.language, 'unknown') AS language,
+        DATE_TRUNC('week', r.review_date) AS week_start,
+        COUNT(*) AS review_count,
+        SUM(SNOWFLAKE.CORTEX.SENTIMENT(
+            CASE
+                WHEN r.language = 'en' THEN r.review_text
+                ELSE SNOWFLAKE.CORTEX.TRANSLATE(r.review_text, r.language, 'en')
+            END
+        )) AS sentiment_sum,
+        SUM(r.rating) AS rating_sum,
+        COUNT(CASE WHEN r.rating >= 4.0 THEN 1 END) AS recommend_count
+    FROM nike_reviews.raw_support.product_reviews_cube_stream r
+    JOIN nike_reviews.raw_pos.products p
+        ON p.product_id = r.product_id
+    GROUP BY 1, 2, 3, 4, 5, 6
+) s
+    ON c.product_id = s.product_id
+    AND c.source = s.source
+    AND c.language = s.language
+    AND c.week_start = s.week_start
+WHEN MATCHED THEN UPDATE SET
+    c.review_count = c.review_count + s.review_count,
+    c.sentiment_sum = c.sentiment_sum + s.sentiment_sum,
+    c.rating_sum = c.rating_sum + s.rating_sum,
+    c.recommend_count = c.recommend_count + s.recommend_count,
+    c.last_updated = CURRENT_TIMESTAMP()::TIMESTAMP_NTZ
+WHEN NOT MATCHED THEN INSERT
+    (product_id, product_name, brand_name, source, language, week_start,
+     review_count, sentiment_sum, rating_sum, recommend_count, last_updated)
+VALUES
+    (s.product_id, s.product_name, s.brand_name, s.source, s.language, s.week_start,
+     s.review_count, s.sentiment_sum, s.rating_sum, s.recommend_count, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ);
+
+-- the task owner (sysadmin) needs EXECUTE TASK to resume it and for its scheduled runs
+USE ROLE accountadmin;
+GRANT EXECUTE TASK ON ACCOUNT TO ROLE sysadmin;
+USE ROLE sysadmin;
+ALTER TASK nike_reviews.analytics.review_sentiment_cube_refresh_task RESUME;
+
+-- Grant access to the cube
+GRANT USAGE ON DATABASE nike_reviews TO ROLE nike_po_data_scientist;
+GRANT USAGE ON SCHEMA nike_reviews.analytics TO ROLE nike_po_data_scientist;
+GRANT SELECT ON TABLE nike_reviews.analytics.review_sentiment_weekly_cube TO ROLE nike_po_data_scientist;
+
+SELECT 'Weekly sentiment rollup cube created successfully!' AS cube_status;
+
 
 /***********************************************************************************************************
 **